@@ -1,15 +1,29 @@
 import streamlit as st
-import feedparser
-from bs4 import BeautifulSoup
-from dateutil import tz
 from datetime import datetime, timedelta, date
-import re
-import csv
-from io import StringIO
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter
+import requests
+from requests.adapters import HTTPAdapter
+
+from news import (
+    FILTERED_DOMAINS,
+    TIMEZONE,
+    NewsItem,
+    clean_html,
+    day_bounds,
+    dedup_key,
+    export_csv,
+    feed_language,
+    has_econ_keyword,
+    parse_feed,
+    simple_summarize,
+)
 
 # --------- Paramètres ---------
 APP_TITLE = "News Éco Maroc"
-TIMEZONE = tz.gettz("Africa/Casablanca")
+
+CACHE_TTL = 600  # secondes
 
 RSS_FEEDS = [
     "https://www.challenge.ma/feed",
@@ -28,108 +42,91 @@ RSS_FEEDS = [
     "https://rss.app/feeds/6AZTWsoIWodqhrfH.xml"
 ]
 
-ECON_KEYWORDS = [
-    "économie", "economy", "business", "finance", "bourse", "marché",
-    "banque", "bank", "investissement", "investment", "entreprise", "PME",
-    "inflation", "croissance", "PIB", "export", "import", "commerce",
-    "industrie", "énergie", "oil", "gaz", "mines", "telecom", "tourisme",
-]
+HTTP_TIMEOUT = 10
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; NewsEcoMaroc/1.0)",
+    "Accept-Encoding": "gzip, deflate",
+}
 
-# --------- Fonctions utilitaires ---------
-def clean_html(text: str) -> str:
-    if not text:
-        return ""
-    soup = BeautifulSoup(text, "html.parser")
-    return soup.get_text(" ", strip=True)
-
-def simple_summarize(text: str, max_sentences: int = 2, max_words: int = 50) -> str:
-    txt = clean_html(text)
-    txt = re.sub(r"\s+", " ", txt).strip()
-    if not txt:
-        return ""
-    sentences = re.split(r"(?<=[\.\!\?])\s+", txt)
-    picked = []
-    word_count = 0
-    for s in sentences:
-        w = len(s.split())
-        if w == 0:
-            continue
-        if word_count + w > max_words and picked:
-            break
-        picked.append(s)
-        word_count += w
-        if len(picked) >= max_sentences:
-            break
-    summary = " ".join(picked)
-    words = summary.split()
-    if len(words) > max_words:
-        summary = " ".join(words[:max_words]) + " …"
-    return summary
-
-def parse_entry_datetime(entry) -> datetime | None:
-    t = None
-    for key in ("published_parsed", "updated_parsed", "created_parsed"):
-        if hasattr(entry, key):
-            t = getattr(entry, key)
-            if t:
-                break
-        if key in entry:
-            t = entry[key]
-            if t:
-                break
-    if t is None:
+# --------- Récupération des flux ---------
+def make_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(HEADERS)
+    return session
+
+@st.cache_resource
+def feed_http_cache() -> dict:
+    # url -> (etag, last_modified, contenu) du dernier téléchargement réussi
+    return {}
+
+def download_feed(session: requests.Session, url: str, http_cache: dict) -> bytes | None:
+    cached = http_cache.get(url)
+    headers = {}
+    if cached:
+        etag, modified, _ = cached
+        if etag:
+            headers["If-None-Match"] = etag
+        if modified:
+            headers["If-Modified-Since"] = modified
+    try:
+        r = session.get(url, headers=headers, timeout=HTTP_TIMEOUT)
+        if r.status_code == 304 and cached:
+            return cached[2]
+        r.raise_for_status()
+    except requests.RequestException:
         return None
-    dt = datetime(*t[:6])
-    return dt.replace(tzinfo=TIMEZONE)
+    http_cache[url] = (r.headers.get("ETag"), r.headers.get("Last-Modified"), r.content)
+    return r.content
 
-def same_day(dt: datetime, target_day: date) -> bool:
-    local = dt.astimezone(TIMEZONE)
-    return local.date() == target_day
+def download_feeds(urls) -> list[bytes | None]:
+    # Téléchargements en parallèle : la latence totale devient celle du flux le plus lent
+    http_cache = feed_http_cache()
+    with make_session() as session, ThreadPoolExecutor(max_workers=len(urls)) as pool:
+        return list(pool.map(lambda u: download_feed(session, u, http_cache), urls))
 
-# --------- Récupération des flux ---------
-def fetch_news_for_day(target_day: date):
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def fetch_news_for_day(target_day: date) -> list[NewsItem]:
     items = []
-    for url in RSS_FEEDS:
+    seen = set()
+    target_start, target_end = day_bounds(target_day)
+    for url, content in zip(RSS_FEEDS, download_feeds(RSS_FEEDS)):
+        if content is None:
+            continue
         try:
-            feed = feedparser.parse(url)
+            source_title, updated, entries = parse_feed(url, content)
         except Exception:
             continue
-        source_title = feed.feed.get("title", url)
-        for entry in feed.entries:
-            dt = parse_entry_datetime(entry) or datetime.now(TIMEZONE)
-            if not same_day(dt, target_day):
+        if updated is not None and updated < target_start:
+            continue
+        lang = feed_language(url)
+        needs_keyword_filter = any(d in url for d in FILTERED_DOMAINS)
+        for dt, raw_title, desc, link in entries:
+            dt = dt or datetime.now(TIMEZONE)
+            ts = dt.timestamp()
+            if not target_start <= ts < target_end:
                 continue
-            title = clean_html(entry.get("title", "(sans titre)"))
-            link = entry.get("link", "")
-            desc = entry.get("summary") or entry.get("description") or ""
-            summary = simple_summarize(desc)
-            haystack = f"{title} {desc}".lower()
-            if any(domain in url for domain in ["telquel", "lematin", "le360", "hespress"]) and not any(k in haystack for k in ECON_KEYWORDS):
+            # Filtre sur le texte brut : les balises ne gênent pas la recherche de mots-clés
+            if needs_keyword_filter and not has_econ_keyword(f"{raw_title} {desc}"):
                 continue
-            items.append({
-                "source": source_title,
-                "title": title,
-                "summary": summary or "(Résumé non disponible)",
-                "time": dt.strftime("%H:%M"),
-                "link": link
-            })
-    seen = set()
-    unique = []
-    for it in items:
-        key = (it["title"], it["source"])
-        if key in seen:
-            continue
-        seen.add(key)
-        unique.append(it)
-    return unique
-
-def export_csv(rows):
-    output = StringIO()
-    writer = csv.DictWriter(output, fieldnames=["source", "title", "summary", "time", "link"])
-    writer.writeheader()
-    for r in rows:
-        writer.writerow(r)
-    return output.getvalue()
+            key = dedup_key(link, raw_title, source_title)
+            if key in seen:
+                continue
+            seen.add(key)
+            title = clean_html(raw_title)
+            summary = simple_summarize(desc, lang=lang)
+            items.append(NewsItem(
+                source=source_title,
+                title=title,
+                summary=summary or "(Résumé non disponible)",
+                time=sys.intern(dt.strftime("%H:%M")),
+                link=link,
+                ts=ts,
+            ))
+    items.sort(key=attrgetter("ts"), reverse=True)
+    return items
 
 # --------- UI Streamlit ---------
 st.set_page_config(page_title="News Éco Maroc", page_icon="📰", layout="centered")
@@ -145,7 +142,7 @@ else:
     selected_day = st.date_input("Choisir la date", value=datetime.now(TIMEZONE).date())
 
 if st.button("🔄 Rafraîchir"):
-    st.rerun()
+    fetch_news_for_day.clear()
 
 news = fetch_news_for_day(selected_day)
 
@@ -156,11 +153,11 @@ if not news:
 else:
     for item in news:
         with st.container():
-            st.markdown(f"### {item['title']}")
-            st.write(item["summary"])
-            meta = f"**Source :** {item['source']}  •  **Heure :** {item['time']}"
+            st.markdown(f"### {item.title}")
+            st.write(item.summary)
+            meta = f"**Source :** {item.source}  •  **Heure :** {item.time}"
             st.markdown(meta)
-            st.link_button("Lire l'article", item["link"], use_container_width=True)
+            st.link_button("Lire l'article", item.link, use_container_width=True)
     csv_data = export_csv(news)
     st.download_button(
         label="⬇️ Exporter CSV",
@@ -0,0 +1,203 @@
+import re
+import sys
+import hashlib
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, date, time
+from functools import lru_cache
+from operator import attrgetter
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import ahocorasick
+import feedparser_rs as feedparser
+import pysbd
+from dateutil import tz
+from selectolax.lexbor import LexborHTMLParser
+
+# Ce module est importé (et non ré-exécuté à chaque rerun Streamlit comme app.py) :
+# les caches qu'il contient survivent d'une interaction à l'autre, et NewsItem garde
+# une identité stable pour le pickle de st.cache_data.
+
+TIMEZONE = tz.gettz("Africa/Casablanca")
+
+# Sources généralistes : on ne garde que les articles contenant un mot-clé éco
+FILTERED_DOMAINS = ("telquel", "lematin", "le360", "hespress")
+
+ECON_KEYWORDS = [
+    "économie", "economy", "business", "finance", "bourse", "marché",
+    "banque", "bank", "investissement", "investment", "entreprise", "PME",
+    "inflation", "croissance", "PIB", "export", "import", "commerce",
+    "industrie", "énergie", "oil", "gaz", "mines", "telecom", "tourisme",
+]
+
+_WS_RE = re.compile(r"\s+")
+_KW_AUTOMATON = ahocorasick.Automaton()
+for _k in ECON_KEYWORDS:
+    _KW_AUTOMATON.add_word(_k.lower(), _k)
+_KW_AUTOMATON.make_automaton()
+# Balises qui marquent une frontière de phrase dans les descriptions
+_BLOCK_TAGS = frozenset({
+    "p", "br", "div", "li", "blockquote", "h1", "h2", "h3", "h4", "h5", "h6",
+})
+# pysbd.Segmenter garde le texte en cours dans son état : un jeu par thread
+_segmenters = threading.local()
+
+@dataclass(slots=True, frozen=True)
+class NewsItem:
+    source: str
+    title: str
+    summary: str
+    time: str
+    link: str
+    ts: float
+
+# --------- Fonctions utilitaires ---------
+def clean_html(text: str) -> str:
+    if not text:
+        return ""
+    txt = LexborHTMLParser(text).text(separator=" ", strip=True)
+    return " ".join(txt.split())
+
+def parse_entry_datetime(entry) -> datetime | None:
+    for key in ("published_parsed", "updated_parsed", "created_parsed"):
+        t = entry.get(key)
+        if t:
+            break
+    else:
+        return None
+    return datetime(*t[:6], tzinfo=TIMEZONE)
+
+def has_econ_keyword(text: str) -> bool:
+    return next(_KW_AUTOMATON.iter(text.lower()), None) is not None
+
+def feed_language(url: str) -> str:
+    return "ar" if "://ar." in url else "fr"
+
+def get_segmenter(lang: str) -> pysbd.Segmenter:
+    seg = getattr(_segmenters, lang, None)
+    if seg is None:
+        seg = pysbd.Segmenter(language=lang, clean=False, char_span=True)
+        setattr(_segmenters, lang, seg)
+    return seg
+
+def iter_sentences(txt: str, lang: str = "fr"):
+    # Renvoie (début, fin, nb de mots) de chaque phrase, sans copier le texte
+    for span in get_segmenter(lang).segment(txt):
+        start, end = span.start, span.end
+        while start < end and txt[start] == " ":
+            start += 1
+        while end > start and txt[end - 1] == " ":
+            end -= 1
+        if start < end:
+            yield start, end, txt.count(" ", start, end) + 1
+
+def iter_text_blocks(html: str):
+    # Texte de chaque bloc (<p>, <br>, <li>…), produit au fil du parcours du DOM
+    body = LexborHTMLParser(html).body
+    if body is None:
+        return
+    buf = []
+    for node in body.traverse(include_text=True):
+        if node.tag == "-text":
+            buf.append(node.text(deep=False))
+        elif node.tag in _BLOCK_TAGS and buf:
+            block = _WS_RE.sub(" ", " ".join(buf)).strip()
+            buf = []
+            if block:
+                yield block
+    block = _WS_RE.sub(" ", " ".join(buf)).strip()
+    if block:
+        yield block
+
+def iter_html_sentences(html: str, lang: str = "fr", max_words: int | None = None):
+    for block in iter_text_blocks(html):
+        if max_words is not None:
+            # pysbd est coûteux : au-delà de max_words + 1 mots, le texte ne peut plus
+            # changer le résumé, on ne le segmente donc pas
+            cut = -1
+            for _ in range(max_words + 1):
+                cut = block.find(" ", cut + 1)
+                if cut < 0:
+                    break
+            if cut >= 0:
+                block = block[:cut]
+        for start, end, w in iter_sentences(block, lang):
+            yield block[start:end], w
+
+def simple_summarize(text: str, max_sentences: int = 2, max_words: int = 50, lang: str = "fr") -> str:
+    # Le parcours s'arrête dès que le résumé est complet : la fin de la description n'est pas lue
+    if not text:
+        return ""
+    picked = []
+    word_count = 0
+    for sentence, w in iter_html_sentences(text, lang, max_words):
+        if word_count + w > max_words and picked:
+            break
+        picked.append(sentence)
+        word_count += w
+        if len(picked) >= max_sentences:
+            break
+    summary = " ".join(picked)
+    if word_count > max_words:
+        cut = -1
+        for _ in range(max_words):
+            cut = summary.index(" ", cut + 1)
+        return summary[:cut] + " …"
+    return summary
+
+def canonical_link(link: str) -> str:
+    # Hôte en minuscules, sans paramètres de suivi utm_* ni fragment
+    link = link.strip()
+    try:
+        parts = urlsplit(link)
+    except ValueError:
+        return link
+    query = urlencode([
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_")
+    ])
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, query, ""))
+
+def dedup_key(link: str, title: str, source: str) -> int:
+    canonical = canonical_link(link) if link else f"{source}\n{title}"
+    return int.from_bytes(hashlib.blake2b(canonical.encode(), digest_size=8).digest(), "big")
+
+def day_bounds(target_day: date) -> tuple[float, float]:
+    # Début et fin (exclue) de la journée locale, en timestamps
+    start = datetime.combine(target_day, time.min, TIMEZONE)
+    end = datetime.combine(target_day + timedelta(days=1), time.min, TIMEZONE)
+    return start.timestamp(), end.timestamp()
+
+# --------- Analyse des flux ---------
+@lru_cache(maxsize=64)
+def parse_feed(url: str, content: bytes) -> tuple[str, float | None, tuple]:
+    # Analyse indexée par le contenu brut : réutilisée d'un jour à l'autre tant que le flux ne change pas
+    feed = feedparser.parse(content)
+    entries = tuple(
+        (
+            parse_entry_datetime(entry),
+            entry.get("title", "(sans titre)"),
+            entry.get("summary") or entry.get("description") or "",
+            entry.get("link", ""),
+        )
+        for entry in feed.entries
+    )
+    # Date de mise à jour du flux (lastBuildDate / updated) : borne sup. des entrées
+    t = feed.feed.get("updated_parsed") or feed.feed.get("published_parsed")
+    updated = datetime(*t[:6], tzinfo=TIMEZONE).timestamp() if t else None
+    # feedparser-rs laisse certaines entités (&amp;) dans le titre du flux
+    return sys.intern(clean_html(feed.feed.get("title", url))), updated, entries
+
+# --------- Export ---------
+CSV_COLUMNS = ("source", "title", "summary", "time", "link")
+_csv_row = attrgetter(*CSV_COLUMNS)
+
+def csv_field(value: str) -> str:
+    if any(c in value for c in ',"\r\n'):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+def export_csv(rows: list[NewsItem]) -> str:
+    lines = [",".join(CSV_COLUMNS)]
+    lines.extend(",".join(map(csv_field, _csv_row(r))) for r in rows)
+    return "\n".join(lines) + "\n"